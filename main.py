@@ -1,15 +1,114 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_cache import CachedSession
+from datetime import datetime, timedelta, timezone
+import lxml.html
+from lxml.etree import ParserError, XPath, XPathError
 import re
+import codecs
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import time
 from tqdm import tqdm
 import os
+import glob
+import json
 import concurrent.futures
+import multiprocessing
+import functools
+import threading
 import logging
 import shutil
 
 
+# columns added to the input
+ENRICHED_COLUMNS = ['content', 'title', 'date', 'media_name', 'journalist_name']
+# columns read from the article page, in the order enrich_row returns them
+FETCHED_COLUMNS = ['content', 'title', 'date', 'journalist_name']
+
+# regexes used on every row, compiled once
+SCHEME_RE = re.compile(r'^https?://', re.IGNORECASE)
+TITLE_RE = re.compile(r'\s*-\s*.*$') #trailing " - Media Name" in titles
+DATE_STRIP_RE = re.compile(r'\s*-\s*.*$')
+DATE_EXTRACT_RE = re.compile(r'.*?(\d{2}\s+[A-Za-z]{3}\s+\d{4}).*')
+MEDIA_RE = re.compile(r'^(?:https?://)?(?:www\.)?([^/]+)')
+CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+TRACKING_PARAM_RE = re.compile(r'^(?:utm_\w+|fbclid|gclid|mc_cid|mc_eid)$', re.IGNORECASE)
+
+# xpath selectors used on every page, compiled once
+TITLE_XPATH = XPath('string(//title)')
+
+# first element whose class mentions a date, matched case-insensitively
+LOWERCASE_CLASS = 'translate(@class, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")'
+DATE_XPATH = XPath(
+    f'(//*[contains({LOWERCASE_CLASS}, "date")'
+    f' or contains({LOWERCASE_CLASS}, "calendar")'
+    f' or contains({LOWERCASE_CLASS}, "published")])[1]'
+)
+
+# article paragraphs, preferring those inside <article> or <main> over nav, footer and related links
+# only the first MAX_PARAGRAPHS are read, which covers the body of a news article
+MAX_PARAGRAPHS = 50
+CONTENT_XPATH = XPath(f'(//article//p | //main//p)[position() <= {MAX_PARAGRAPHS}]')
+FALLBACK_CONTENT_XPATH = XPath(f'(//p)[position() <= {MAX_PARAGRAPHS}]')
+
+# meta tags that may hold the journalist name, in order of preference
+JOURNALIST_XPATHS = [
+    XPath('//meta[@name="author"]/@content'),
+    XPath('//meta[@property="article:author"]/@content'),
+    XPath('//meta[@property="content:author"]/@content')
+]
+
+# per-site xpath rules for fields the generic selectors miss, keyed by media name
+DOMAIN_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "domain_rules.json")
+DOMAIN_RULE_FIELDS = ('title', 'date', 'journalist_name')
+
+# pages are read up to this size, which is plenty for the title, meta tags and article body
+MAX_BODY_BYTES = 2_000_000
+
+# number of hosts crawled at the same time, one article at a time per host
+MAX_WORKERS = 100
+
+# how long fetched pages are kept in the on-disk cache
+CACHE_EXPIRY = timedelta(days=7)
+
+#requests-cache would read a response's whole body before returning it, so it never writes fresh pages
+#itself; cache_body saves them once read_body has capped them. pages already cached are kept
+def is_cacheable(response):
+    return getattr(response, 'from_cache', False)
+
+# one session shared by every worker, so requests to the same host reuse keep-alive connections
+# a pool is kept for every host being crawled, so no worker's warm connection is evicted
+# successful pages are cached on disk for a week, so re-runs over the same links skip the network
+SESSION = CachedSession(
+    'news_cache',
+    backend='sqlite',
+    expire_after=CACHE_EXPIRY,
+    allowable_codes=(200,),
+    filter_fn=is_cacheable
+)
+# only connection problems and temporary server errors are retried, honouring Retry-After
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=('GET', 'HEAD'),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+for prefix in ("https://", "http://"):
+    SESSION.mount(prefix, HTTPAdapter(pool_connections=MAX_WORKERS, max_retries=RETRY))
+
+# scheme that worked for each host whose links come without one, so only its first link is probed
+# hosts reachable over neither scheme are kept as None
+HOST_SCHEMES = {}
+HOST_SCHEMES_LOCK = threading.Lock()
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
 # ---initializing functions---
 #initialize log file
 def setup_logging():
@@ -18,165 +117,374 @@ def setup_logging():
         os.makedirs(log_folder)
     timestamp = time.strftime("%d-%m-%Y-%H.%M.%S", time.localtime(time.time()))
     log_file_path = f"{log_folder}/enrichment_logs_{timestamp}.log"
-    logging.basicConfig(filename=log_file_path, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.basicConfig(filename=log_file_path, level=logging.INFO, format=LOG_FORMAT)
     logging.info("Logging setup complete.")
+    return log_file_path
+
+#send log records from the parser processes to the same log file
+def setup_worker_logging(log_file_path):
+    logging.basicConfig(filename=log_file_path, level=logging.INFO, format=LOG_FORMAT)
 
-#initialize beautiful soup that handles errors
-def init_soup(page_link): 
-    for attempt in range(3):
+#read an input csv, keeping links as text whatever they look like
+#empty cells are read as missing, and dates and times are kept as written, as pandas read them
+def read_input_csv(path):
+    column_types = {'page_link': pa.string()}
+    convert_options = pyarrow.csv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    with pyarrow.csv.open_csv(path, convert_options=convert_options) as reader: #infers from the first block only
+        for field in reader.schema:
+            if pa.types.is_temporal(field.type):
+                column_types[field.name] = pa.string()
+    convert_options.column_types = column_types
+    return pyarrow.csv.read_csv(path, convert_options=convert_options)
+
+#cast every table to one type per column, so files whose columns were inferred differently can be joined
+#types pyarrow can widen (int and float, or a column empty in one file) are widened, others become text
+def unify_tables(tables):
+    fields = {}
+    for table in tables:
+        for field in table.schema:
+            fields.setdefault(field.name, []).append(field)
+
+    column_types = {}
+    for name, same_name_fields in fields.items():
         try:
-            response = requests.get(page_link, timeout = 6)
-            soup = BeautifulSoup(response.text, 'lxml')
-            return soup
-        except (AttributeError, 
-                requests.exceptions.ChunkedEncodingError, 
-                requests.exceptions.ConnectionError, 
-                requests.exceptions.SSLError,
-                requests.exceptions.ReadTimeout) as e:
-            logging.error(f"Error processing URL '{page_link}': {e}")
-            time.sleep(1)
-    
-    return None
+            unified = pa.unify_schemas([pa.schema([field]) for field in same_name_fields], promote_options="permissive")
+            column_types[name] = unified.field(name).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            column_types[name] = pa.string()
 
-# ---main functions---
-# enrich content
-def enrich_content(df):
-    def get_content(page_link):
+    return [
+        table.cast(pa.schema([pa.field(field.name, column_types[field.name]) for field in table.schema]))
+        for table in tables
+    ]
+
+#load the per-site rules, compiling each selector once
+def load_domain_rules(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as file:
+        rules = json.load(file)
+
+    domain_rules = {}
+    for media_name, fields in rules.items():
+        unknown_fields = set(fields) - set(DOMAIN_RULE_FIELDS)
+        if unknown_fields:
+            raise ValueError(f"Unknown fields {sorted(unknown_fields)} for '{media_name}' in {path}")
+        domain_rules[media_name.lower()] = {field: XPath(xpath) for field, xpath in fields.items()}
+    return domain_rules
+
+DOMAIN_RULES = load_domain_rules(DOMAIN_RULES_PATH)
+
+#fetch a page, trying https and then http for links without a protocol
+#the body is streamed, so callers read as much of it as they need
+def fetch_page(page_link):
+    if SCHEME_RE.match(page_link):
+        return SESSION.get(page_link, timeout = 6, stream = True)
+
+    host = page_link.split('/', 1)[0].lower()
+    with HOST_SCHEMES_LOCK:
+        probed = host in HOST_SCHEMES
+        scheme = HOST_SCHEMES.get(host)
+    if scheme:
+        return SESSION.get(f"{scheme}://{page_link}", timeout = 6, stream = True)
+    if probed:
+        raise requests.exceptions.ConnectionError(f"'{host}' was unreachable over both https and http")
+
+    try:
+        response = SESSION.get(f"https://{page_link}", timeout = 6, stream = True)
+        scheme = "https"
+    except requests.exceptions.ConnectionError: #also covers SSLError
         try:
-            soup = init_soup(page_link)
-            paragraphs = [
-                p.get_text(separator=" ", strip=True)
-                for p in soup.find_all('p')
-                if p.get_text(strip=True)
-            ]
-            content = "".join(paragraphs).replace("\n", " ")
-            return content
-        except (AttributeError, 
-                requests.exceptions.MissingSchema, 
-                requests.exceptions.ConnectionError, 
-                requests.exceptions.SSLError) as e:
-            logging.error(f"Error processing URL '{page_link}': {e}")
-            return None
-    tqdm.pandas(desc="Getting article content", colour="green")
-    return df['page_link'].progress_apply(get_content)
-
-# enrich title
-def enrich_title(df):
-    def get_title(page_link):
+            response = SESSION.get(f"http://{page_link}", timeout = 6, stream = True)
+            scheme = "http"
+        except requests.exceptions.ConnectionError:
+            #remember dead hosts too, so their other links fail fast
+            with HOST_SCHEMES_LOCK:
+                HOST_SCHEMES[host] = None
+            raise
+    with HOST_SCHEMES_LOCK:
+        HOST_SCHEMES[host] = scheme
+    return response
+
+#read a streamed body, stopping once MAX_BODY_BYTES have arrived
+def read_body(response):
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= MAX_BODY_BYTES:
+            break
+    return b"".join(chunks)[:MAX_BODY_BYTES]
+
+#save a freshly fetched page with the body read_body kept, so gzip and chunked pages are cached too
+#called once the response is closed, so requests-cache has nothing left to read from the connection
+def cache_body(response, body):
+    if response.from_cache or response.status_code != 200:
+        return
+    response._content = body
+    response._content_consumed = True
+    SESSION.cache.save_response(response, expires=datetime.now(timezone.utc) + CACHE_EXPIRY)
+
+#charset declared in the Content-Type header, if it names a codec python knows
+def get_charset(content_type):
+    match = CHARSET_RE.search(content_type)
+    if not match:
+        return None
+    try:
+        codecs.lookup(match.group(1))
+    except LookupError:
+        return None
+    return match.group(1)
+
+#fetch a page body and its declared charset that handles errors
+#connection errors and timeouts are retried by the session's adapter
+def fetch_body(page_link): 
+    try:
+        with fetch_page(page_link) as response:
+            if not response.ok:
+                logging.error(f"Error processing URL '{page_link}': HTTP {response.status_code}")
+                return None, None
+            content_type = response.headers.get('Content-Type', '')
+            if content_type and 'html' not in content_type.lower():
+                logging.error(f"Error processing URL '{page_link}': not an HTML page ({content_type})")
+                return None, None
+            body = read_body(response)
+        cache_body(response, body)
+        return body, get_charset(content_type)
+    except requests.exceptions.RequestException as e: #also covers invalid links and redirect loops
+        logging.error(f"Error processing URL '{page_link}': {e}")
+    
+    return None, None
+
+#html parser decoding with the given charset, reused across pages in each parser process
+@functools.lru_cache(maxsize=None)
+def get_parser(charset):
+    return lxml.html.HTMLParser(encoding=charset)
+
+#initialize the html tree that handles errors
+def init_tree(page_link, body, charset=None):
+    try:
+        #hand lxml the raw bytes, decoded with the header charset when there is one
+        #otherwise lxml detects the encoding itself from the page's <meta charset>
         try:
-            soup = init_soup(page_link)
-            title = soup.title.string
-            if title:
-                title = " ".join(title.split()).replace("\n", " ") #remove whitespaces and line breaks
-                title = re.sub(r'\s*-\s*.*$', '', title)
-                return title
-            else:
-                title = None
-                return title
-        except (AttributeError, 
-                requests.exceptions.MissingSchema, 
-                requests.exceptions.ConnectionError, 
-                requests.exceptions.SSLError) as e:
-            logging.error(f"Error processing URL '{page_link}': {e}")
-            return None
-    tqdm.pandas(desc="Getting article title", colour="green")
-    return df['page_link'].progress_apply(get_title)
-
-# enrich date
-def enrich_date(df):
-    def get_date(page_link):
+            parser = get_parser(charset) if charset else None
+        except LookupError: #a codec libxml2 doesn't support
+            parser = None
+        tree = lxml.html.document_fromstring(body, parser=parser)
+        return tree
+    except ParserError as e:
+        logging.error(f"Error processing URL '{page_link}': {e}")
+        return None
+
+# ---main functions---
+# text of an element and its children, stripped piece by piece
+def get_text(element, separator=""):
+    return separator.join(text.strip() for text in element.itertext() if text.strip())
+
+# get article content
+def get_content(tree):
+    paragraphs = []
+    for p in CONTENT_XPATH(tree) or FALLBACK_CONTENT_XPATH(tree):
+        text = get_text(p, separator=" ")
+        if text:
+            paragraphs.append(text)
+    content = " ".join(paragraphs).replace("\n", " ")
+    return content
+
+# text of the first non-empty match of a site rule
+# rules must select strings or elements; numbers and booleans from count() or tests are ignored
+def apply_rule(rule, tree):
+    result = rule(tree)
+    for item in (result if isinstance(result, list) else [result]):
+        if isinstance(item, str):
+            text = item.strip()
+        elif isinstance(item, lxml.html.HtmlElement):
+            text = get_text(item, separator=" ")
+        else:
+            continue
+        if text:
+            return text
+    return None
+
+# get article title
+def get_title(tree, rule=None):
+    title = apply_rule(rule, tree) if rule else TITLE_XPATH(tree)
+    if title:
+        title = " ".join(title.split()).replace("\n", " ") #remove whitespaces and line breaks
+        title = TITLE_RE.sub('', title)
+        return title
+    else:
+        return None
+
+# get article date
+def get_date(tree, rule=None):
+    if rule:
+        raw_date = apply_rule(rule, tree)
+    else:
+        date = DATE_XPATH(tree)
+        raw_date = get_text(date[0]) if date else None
+    if raw_date:
+        raw_date = DATE_STRIP_RE.sub('', raw_date)
+        raw_date = DATE_EXTRACT_RE.sub(r'\1', raw_date)
+        return raw_date
+    else:
+        return None
+
+# get article journalist name
+def get_journalist_name(tree, rule=None):
+    if rule:
+        return apply_rule(rule, tree)
+    for journalist_xpath in JOURNALIST_XPATHS:
+        for content in journalist_xpath(tree):
+            if content.strip():
+                journalist_name = content.strip()
+                return journalist_name
+    return None
+
+# run a single extractor, so one missing field doesn't blank the others
+# a site rule is tried first, falling back to the generic selector when it finds nothing
+def extract_field(extractor, tree, page_link, rule=None):
+    if rule:
         try:
-            soup = init_soup(page_link)
-            date = soup.find(attrs={'class': re.compile(r'.*date|calendar|published.*', re.IGNORECASE)})
-            if date:
-                raw_date = date.get_text(strip=True)
-                raw_date = re.sub(r'\s*-\s*.*$', '', raw_date)
-                raw_date = re.sub(r'.*?(\d{2}\s+[A-Za-z]{3}\s+\d{4}).*', r'\1', raw_date)
-                return raw_date
-            else:
-                return None
-        except (AttributeError, 
-                requests.exceptions.MissingSchema, 
-                requests.exceptions.ConnectionError, 
-                requests.exceptions.SSLError) as e:
-            logging.error(f"Error processing URL '{page_link}': {e}")
-            return None 
-    tqdm.pandas(desc="Getting article date", colour="green")
-    return df['page_link'].progress_apply(get_date)
-
-# enrich media name
-def enrich_media_name(df):
-    pattern = r'^(?:https?://)?([^/]+)'
-    tqdm.pandas(desc="Getting article media name", colour="green")
-    return df['page_link'].progress_apply(
-        lambda page_link: re.match(pattern, page_link).group(1) if re.match(pattern, page_link) else None
+            value = extractor(tree, rule)
+            if value:
+                return value
+        except (AttributeError, XPathError) as e:
+            logging.error(f"Error processing URL '{page_link}' with its domain rule: {e}")
+    try:
+        return extractor(tree)
+    except AttributeError as e:
+        logging.error(f"Error processing URL '{page_link}': {e}")
+        return None
+
+# parse a fetched page and extract its fields, run in the parser processes
+def parse_body(page_link, body, charset, media_name):
+    tree = init_tree(page_link, body, charset) if body is not None else None
+    if tree is None:
+        return None, None, None, None
+
+    rules = DOMAIN_RULES.get(media_name, {})
+    return (
+        extract_field(get_content, tree, page_link),
+        extract_field(get_title, tree, page_link, rules.get('title')),
+        extract_field(get_date, tree, page_link, rules.get('date')),
+        extract_field(get_journalist_name, tree, page_link, rules.get('journalist_name')),
     )
 
-# enrich journalist name
-def enrich_journalist_name(df):
-    def get_journalist_name(page_link):
-        try:
-            soup = init_soup(page_link)
-            
-            # list of attribute dictionaries to check
-            meta_checks = [
-                {'name': 'author'},
-                {'property': 'article:author'},
-                {'property': 'content:author'}
-            ]
-            
-            for attrs in meta_checks:
-                meta_tag = soup.find('meta', attrs=attrs)
-                if meta_tag and meta_tag.get('content'):
-                    journalist_name = meta_tag['content'].strip()
-                    return(journalist_name)
-        
-        except (AttributeError, 
-                requests.exceptions.MissingSchema, 
-                requests.exceptions.ConnectionError, 
-                requests.exceptions.SSLError) as e:
-            logging.error(f"Error processing URL '{page_link}': {e}")
-            return None
-    tqdm.pandas(desc="Getting article journalist name", colour="green")
-    return df['page_link'].progress_apply(get_journalist_name)
+# canonical form of a link, so copies that differ only in host case or tracking parameters match
+# malformed links are kept as they are, so fetch_body logs them instead of the run stopping here
+def canonicalize_link(page_link):
+    has_scheme = bool(SCHEME_RE.match(page_link))
+    try:
+        parts = urlsplit(page_link if has_scheme else f"//{page_link}")
+    except ValueError: #e.g. an unclosed ipv6 bracket
+        return page_link
+    query = urlencode([
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAM_RE.match(key)
+    ])
+    canonical_link = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+    return canonical_link if has_scheme else canonical_link[2:]
+
+# a link as given, minus its tracking parameters, leaving the rest of the query untouched
+def strip_tracking_params(page_link):
+    link, hash_sign, fragment = page_link.partition('#')
+    link, question_mark, query = link.partition('?')
+    if not question_mark:
+        return page_link
+    params = [param for param in query.split('&') if not TRACKING_PARAM_RE.match(param.split('=', 1)[0])]
+    if params:
+        link = f"{link}?{'&'.join(params)}"
+    return link + hash_sign + fragment
+
+# get article media names, read from the links alone for the whole column at once
+def get_media_names(page_links):
+    return page_links.str.extract(MEDIA_RE, expand=False)
+
+# add the media name next to the fetched columns, in the output column order
+# it's read from the canonical links, so it matches the lowercase names the domain rules are keyed on
+def add_media_name(enriched, canonical_links):
+    enriched['media_name'] = get_media_names(canonical_links)
+    return enriched[ENRICHED_COLUMNS]
+
+# fetch one host's articles one after another, so they share a single warm connection
+# each page goes to the parser processes as soon as it arrives, so parsing overlaps fetching
+def fetch_host(page_links, media_names, parse_pool, progress):
+    parsed = []
+    for row, page_link in page_links.items():
+        body, charset = fetch_body(page_link)
+        parsed.append(parse_pool.submit(parse_body, page_link, body, charset, media_names[row]))
+        progress.update()
+    return parsed
+
+# enrich all articles: hosts fetched in parallel threads, pages parsed in parallel processes
+def enrich_all(df, log_file_path):
+    # fetch each distinct article once, then copy its fields to every row linking to it
+    canonical_links = df['page_link'].dropna().map(canonicalize_link)
+    unique_links = canonical_links.drop_duplicates()
+    if unique_links.empty:
+        enriched = pd.DataFrame(index=df.index, columns=FETCHED_COLUMNS)
+        return add_media_name(enriched, canonical_links)
+
+    # the canonical form is only a key: the first listed copy of each article is fetched as given,
+    # minus its tracking parameters, so signed or flag-style queries reach the site unchanged
+    page_links = df.loc[unique_links.index, 'page_link'].map(strip_tracking_params)
+
+    # the busiest sites without rules are the best candidates for domain_rules.json
+    media_names = get_media_names(unique_links)
+    uncovered = media_names[~media_names.isin(DOMAIN_RULES)].value_counts().head(30)
+    if not uncovered.empty:
+        logging.info("Busiest media without domain rules: " + ", ".join(f"{name} ({count})" for name, count in uncovered.items()))
+
+    # biggest hosts first, so no long host queue is left running on its own at the end
+    host_groups = sorted(
+        (links for _, links in page_links.groupby(media_names, sort=False, dropna=False)),
+        key=len, reverse=True
+    )
+    # parser processes start on the first submit, when the fetch threads are already running and holding
+    # session, cache and connection pool locks, so they're spawned fresh rather than forked from this process
+    parse_pool = concurrent.futures.ProcessPoolExecutor(
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=setup_worker_logging,
+        initargs=(log_file_path,)
+    )
+    with parse_pool:
+        #redraw at most twice a second, which matters when most pages come from the cache
+        with tqdm(total=len(page_links), desc="Enriching news articles", colour="green", mininterval=0.5, smoothing=0) as progress, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(host_groups))) as fetch_pool:
+            parsed = list(fetch_pool.map(
+                functools.partial(fetch_host, media_names=media_names, parse_pool=parse_pool, progress=progress),
+                host_groups
+            ))
+        results = [future.result() for host_parsed in parsed for future in host_parsed]
+    fetched_rows = pd.concat(host_groups).index
+    enriched = pd.DataFrame(results, columns=FETCHED_COLUMNS, index=unique_links.loc[fetched_rows].values)
+    enriched = enriched.loc[canonical_links].set_axis(canonical_links.index)
+    return add_media_name(enriched.reindex(df.index), canonical_links)
 
 # ---main program---
 if __name__ == "__main__":
     time_start = time.time() #determine the current time
-    setup_logging() #set up log file
-    tqdm.pandas() #register to tqdm
+    log_file_path = setup_logging() #set up log file
 
     input_path = "/Users/qaulanmaruf/Desktop/news_enrichment/input"
-    input_folder = os.listdir(input_path)
-    
-    df_list = []
-    for file in input_folder:
-        if file.endswith(".csv"):
-            df_list.append(pd.read_csv(os.path.join(input_path, file)))
+    input_files = glob.glob(os.path.join(input_path, "*.csv"))
     
-    df = pd.concat(df_list, ignore_index=True)
+    # read with pyarrow and join the tables without copying, then convert to pandas once
+    tables = unify_tables([read_input_csv(file) for file in input_files])
+    df = pa.concat_tables(tables, promote_options="default").to_pandas()
     
-    # use a ThreadPoolExecutor to run each processing function concurrently
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        print("\nEnriching news articles...\n")
-        future_content = executor.submit(enrich_content, df)
-        future_title = executor.submit(enrich_title, df)
-        future_date = executor.submit(enrich_date, df)
-        future_media = executor.submit(enrich_media_name, df)
-        future_journalist = executor.submit(enrich_journalist_name, df)
-        
-        # wait for each to complete and assign to new columns
-        df['content'] = future_content.result()
-        df['title'] = future_title.result()
-        df['date'] = future_date.result()
-        df['media_name'] = future_media.result()
-        df['journalist_name'] = future_journalist.result()
+    # fetch each article once and extract every field from the same page
+    print("\nEnriching news articles...\n")
+    df[ENRICHED_COLUMNS] = enrich_all(df, log_file_path)
     
     # save the updated df
     output_path = "/Users/qaulanmaruf/Desktop/news_enrichment/output"
     timestamp = time.strftime("%d-%m-%Y-%H.%M.%S", time.localtime(time.time()))
-    df_output = f"{output_path}/enriched_data_{timestamp}.csv"
-    df.to_csv(df_output, index=False)
+    df_output = f"{output_path}/enriched_data_{timestamp}.parquet"
+    df.to_parquet(df_output, index=False, engine='pyarrow', compression='zstd', compression_level=3)
 
     #move the file in input folder to processed folder
     processed_path = "/Users/qaulanmaruf/Desktop/news_enrichment/processed"